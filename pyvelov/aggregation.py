@@ -0,0 +1,263 @@
+"""
+File from module `pyvelov`. Contains all features required to aggregate stations per commune, per pole
+and per map grid cell (tile) at several zoom levels.
+
+Grid cells are map tiles (Web Mercator, `zoom/x/y` scheme used by OpenStreetMap), so a map tile request
+is a lookup of a precomputed group.
+
+Author : Matthieu BOUCHET
+Author email : matthieu.bouchet@outlook.com
+Author website: https://www.matthieubouchet.fr
+GitHub project: https://github.com/MatthieuBOUCHET/PyVelov
+"""
+
+from math import asinh, floor, pi, radians, tan
+
+DEFAULT_ZOOMS = (12, 14, 16)
+
+
+def tileCoordinates(latitude, longitude, zoom) -> tuple:
+    """Public function converts a position to map tile coordinates.
+
+    Args
+    ----
+        latitude (float): Latitude (degrees)
+        longitude (float): Longitude (degrees)
+        zoom (int): Zoom level
+
+    Returns
+    -------
+        (tuple): (x, y) tile coordinates
+        (None): If `latitude` or `longitude` is None
+    """
+    if latitude is None or longitude is None:
+        return None
+
+    n = 2 ** zoom
+    x = floor((longitude + 180) / 360 * n)
+    y = floor((1 - asinh(tan(radians(latitude))) / pi) / 2 * n)
+
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+class VelovAggregation:
+    """
+    Class represents totals of stations grouped by commune, by pole and by map tile.
+    Groups are built in one pass and updated incrementally when a station is added or removed.
+
+    Each `VelovStation` added is one contribution, as in a `VelovStationsList`: two objects with the same
+    uid are both counted, and so is an object added twice. An aggregation returned by
+    `VelovStationsList.getAggregation()` is kept up to date by the list: update stations through the list
+    (`updateStation()`, `append()`, `remove()`...), not through the aggregation.
+
+    Attributes
+    -----------
+    - `zooms`(tuple): Zoom levels of tiles
+
+    Examples
+    --------
+        aggregation = VelovAggregation(stationsList)
+
+        aggregation.getCommune('Lyon 2 ème')
+        aggregation.getTile(14, 8411, 5844)  # Place Bellecour
+
+        aggregation.removeStation(oldStation)
+        aggregation.addStation(newStation)
+    """
+
+    def __init__(self, stations=(), zooms=DEFAULT_ZOOMS) -> None:
+        """Constructor.
+
+        Args
+        ----
+            stations (iterable): Optional. `VelovStation` objects (a `VelovStationsList` for example)
+            zooms (tuple): Optional. Zoom levels of tiles computed.
+
+        Returns
+        -------
+            None
+        """
+        self.zooms = tuple(zooms)
+
+        self.__communes = {}
+        self.__poles = {}
+        self.__tiles = {zoom: {} for zoom in self.zooms}
+        # id(station) => [count, (station, commune, poles, tiles, values)] : contribution of each station.
+        # Station is kept so its id cannot be reused while it is aggregated.
+        self.__contributions = {}
+
+        for station in stations:
+            self.addStation(station)
+
+        return None
+
+    def __len__(self) -> int:
+        return sum(count for count, contribution in self.__contributions.values())
+
+    def __groupsApply(self, contribution, sign) -> None:
+        """Add (`sign` = 1) or remove (`sign` = -1) a contribution to its groups.
+
+        Args
+        ----
+            contribution (tuple): Contribution of a station
+            sign (int): 1 or -1
+        """
+        station, commune, poles, tiles, values = contribution
+
+        groups = [(self.__communes, commune)]
+        if poles is None:
+            groups.append((self.__poles, None))
+        else:
+            groups.extend((self.__poles, pole) for pole in poles)
+        groups.extend((self.__tiles[zoom], tile) for zoom, tile in tiles)
+
+        for container, key in groups:
+            group = container.get(key)
+            if group is None:
+                group = container[key] = [0, 0, 0, 0, 0]
+
+            for index in range(5):
+                group[index] += sign * values[index]
+
+            if group[0] == 0:
+                del container[key]
+
+    ## INCREMENTAL UPDATES ##
+    def addStation(self, station) -> None:
+        """Add a station to groups.
+
+        Args
+        ----
+            station (VelovStation): A `VelovStation` class instanciation.
+        """
+        known = self.__contributions.get(id(station))
+        if known is not None:
+            known[0] += 1
+            self.__groupsApply(known[1], 1)
+            return None
+
+        values = (1,
+                  1 if station.getAttribute('status') else 0,
+                  station.getAttribute('availableBikes') or 0,
+                  station.getAttribute('availableStands') or 0,
+                  station.getAttribute('totalStands') or 0)
+
+        tiles = []
+        for zoom in self.zooms:
+            tile = tileCoordinates(station.getAttribute('latitude'),
+                                   station.getAttribute('longitude'), zoom)
+            if tile is not None:
+                tiles.append((zoom, tile))
+
+        contribution = (station, station.getAttribute('commune'),
+                        station.getAttribute('pole'), tuple(tiles), values)
+        self.__contributions[id(station)] = [1, contribution]
+        self.__groupsApply(contribution, 1)
+        return None
+
+    def removeStation(self, station) -> bool:
+        """Remove a station from groups.
+
+        Args
+        ----
+            station (VelovStation): A `VelovStation` object previously added.
+
+        Returns
+        -------
+            bool: True if station removed, False if station was not aggregated.
+        """
+        known = self.__contributions.get(id(station))
+        if known is None:
+            return False
+
+        known[0] -= 1
+        if known[0] == 0:
+            del self.__contributions[id(station)]
+        self.__groupsApply(known[1], -1)
+        return True
+
+    ## GETTERS ##
+    @staticmethod
+    def __groupExport(group) -> dict:
+        """Convert a group to a dict of statistics.
+
+        Returns:
+            dict: Dict of statistics
+
+            Keys:
+            - stations (int)
+            - openStations (int)
+            - availableBikes (int)
+            - availableStands (int)
+            - totalStands (int)
+            - percentageAvailableStands (float or None)
+            - fillPercentage (float or None): Percentage of stands with a bike
+        """
+        if group is None:
+            return None
+
+        stations, openStations, bikes, stands, total = group
+        return {
+            'stations': stations,
+            'openStations': openStations,
+            'availableBikes': bikes,
+            'availableStands': stands,
+            'totalStands': total,
+            'percentageAvailableStands': round(stands * 100 / total, 2) if total else None,
+            'fillPercentage': round(bikes * 100 / total, 2) if total else None
+        }
+
+    def getCommune(self, commune) -> dict:
+        """Return statistics of a commune (None if unknown commune)"""
+        return self.__groupExport(self.__communes.get(commune))
+
+    def getPole(self, pole) -> dict:
+        """Return statistics of a pole (None if unknown pole)"""
+        return self.__groupExport(self.__poles.get(pole))
+
+    def getTile(self, zoom, x, y) -> dict:
+        """Return statistics of a map tile.
+
+        Args
+        ----
+            zoom (int): Zoom level, one of `zooms`
+            x (int): Tile x
+            y (int): Tile y
+
+        Returns
+        -------
+            (dict): Statistics (see `getCommune()`)
+            (None): If tile has no station or zoom level is not computed
+        """
+        tiles = self.__tiles.get(zoom)
+        if tiles is None:
+            return None
+        return self.__groupExport(tiles.get((x, y)))
+
+    def getCommunes(self) -> dict:
+        """Return statistics of all communes.
+
+        Returns:
+            dict: commune => dict of statistics
+        """
+        return {commune: self.__groupExport(group) for commune, group in self.__communes.items()}
+
+    def getPoles(self) -> dict:
+        """Return statistics of all poles.
+
+        Returns:
+            dict: pole => dict of statistics
+        """
+        return {pole: self.__groupExport(group) for pole, group in self.__poles.items()}
+
+    def getTiles(self, zoom) -> dict:
+        """Return statistics of all tiles of a zoom level.
+
+        Returns:
+            dict: (x, y) => dict of statistics. Empty if zoom level is not computed.
+        """
+        tiles = self.__tiles.get(zoom, {})
+        return {tile: self.__groupExport(group) for tile, group in tiles.items()}
+
+
+pass
@@ -0,0 +1,592 @@
+"""
+File from module `pyvelov`. Contains all features required to replay archived snapshots and compute
+statistics over them in parallel (map-reduce over a process pool).
+
+A snapshot is a JSON file which is either:
+- a file written by `VelovStationsList.exportListJSONFile()` (list of stations attributes)
+- a raw API file (dict with a `values` key, or list of raw dictionnaries)
+
+Snapshots are read from a directory or from an archive (`.zip`, `.tar`, `.tar.gz`, ...).
+
+Author : Matthieu BOUCHET
+Author email : matthieu.bouchet@outlook.com
+Author website: https://www.matthieubouchet.fr
+GitHub project: https://github.com/MatthieuBOUCHET/PyVelov
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import tarfile
+import zipfile
+import zlib
+
+
+class VelovReplayError(Exception):
+    """Exception `VelovReplayError` based on basic `Exception` class.
+    Raised if path given to `VelovReplay` is neither a directory nor an archive.
+
+    Parent:
+    -------
+        Exception (): Basic built-in Exception class
+    """
+
+    def __init__(self, path):
+        super().__init__(
+            "Snapshots path '{0}' is neither a directory nor a readable archive".format(path))
+
+
+## SNAPSHOTS READING ##
+def listSnapshots(path) -> list:
+    """Public function lists snapshots files stored in a directory or an archive.
+
+    Args
+    ----
+        path (string): Directory or archive (zip, tar) path.
+
+    Raises
+    ------
+        VelovReplayError: If `path` is neither a directory nor a readable archive.
+
+    Returns
+    -------
+        (list): Snapshots names (file paths for a directory, members names for an archive).
+            Sorted by name, except for a tar archive: members are kept in archive order, so a chunk of
+            names is read in one forward pass (a compressed tar cannot be read backward without
+            decompressing it again from the start).
+    """
+    if os.path.isdir(path):
+        names = []
+        for root, dirs, files in os.walk(path):
+            for fileName in files:
+                if fileName.endswith('.json'):
+                    names.append(os.path.join(root, fileName))
+        return sorted(names)
+
+    if os.path.isfile(path) and zipfile.is_zipfile(path):
+        try:
+            with zipfile.ZipFile(path) as archive:
+                return sorted(name for name in archive.namelist() if name.endswith('.json'))
+        except (OSError, zipfile.BadZipFile):
+            raise VelovReplayError(path)
+
+    if os.path.isfile(path) and tarfile.is_tarfile(path):
+        try:
+            with tarfile.open(path) as archive:
+                return [member.name for member in archive.getmembers()
+                        if member.isfile() and member.name.endswith('.json')]
+        except (OSError, EOFError, tarfile.TarError, zlib.error):
+            raise VelovReplayError(path)
+
+    raise VelovReplayError(path)
+
+
+def _readSnapshots(path, names):
+    """Generator reads snapshots and yields their JSON datas.
+    A snapshot which cannot be read or decoded is yielded as `None`.
+
+    Args
+    ----
+        path (string): Directory or archive path given to `listSnapshots()`
+        names (list): Snapshots names returned by `listSnapshots()`
+    """
+    if os.path.isdir(path):
+        for name in names:
+            try:
+                with open(name, 'r') as fileRead:
+                    datas = json.load(fileRead)
+            except (OSError, ValueError, KeyError):
+                datas = None
+            yield datas
+        return
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in names:
+                try:
+                    datas = json.loads(archive.read(name))
+                except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile, zlib.error):
+                    datas = None
+                yield datas
+        return
+
+    # Tar: stream members forward once, without scanning the whole archive (`getmembers()`)
+    remaining = set(names)
+    with tarfile.open(path) as archive:
+        while remaining:
+            try:
+                member = archive.next()
+            except (OSError, EOFError, tarfile.TarError, zlib.error):
+                break
+            if member is None:
+                break
+            if member.name not in remaining:
+                continue
+            remaining.discard(member.name)
+            try:
+                datas = json.load(archive.extractfile(member))
+            except (OSError, ValueError, KeyError, EOFError, tarfile.TarError, zlib.error):
+                datas = None
+            yield datas
+
+    for name in remaining:
+        yield None
+
+
+def _number(value):
+    """Return `value` if it is a number, 0 if it is None.
+
+    Raises
+    ------
+        ValueError: If `value` is neither a number nor None
+    """
+    if value is None:
+        return 0
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError('Station value must be a number: {0!r}'.format(value))
+    return value
+
+
+def _key(value):
+    """Return `value` if it can be used as a group key (not a JSON list or dictionnary).
+
+    Raises
+    ------
+        ValueError: If `value` is a list or a dictionnary
+    """
+    if isinstance(value, (list, dict)):
+        raise ValueError('Station key must be a scalar: {0!r}'.format(value))
+    return value
+
+
+def _stationRecord(dictData) -> tuple:
+    """Extract from one station dictionnary the fields used by statistics.
+    Both raw API dictionnaries and `VelovStation` exported attributes are accepted.
+
+    Args
+    ----
+        dictData (dict): Station datas
+
+    Raises
+    ------
+        ValueError: If `dictData` is not a valid station dictionnary
+
+    Returns
+    -------
+        (tuple): (uid, commune, poles, availableBikes, availableStands, totalStands, status, banking)
+    """
+    if not isinstance(dictData, dict):
+        raise ValueError('Station must be a dictionnary: {0!r}'.format(dictData))
+
+    if 'number' in dictData:
+        pole = dictData.get('pole')
+        if pole is not None and not isinstance(pole, str):
+            raise ValueError('Station pole must be a string: {0!r}'.format(pole))
+        poles = tuple(pole.split(', ')) if pole is not None else None
+        return (_key(dictData.get('number')), _key(dictData.get('commune')), poles,
+                _number(dictData.get('available_bikes')),
+                _number(dictData.get('available_bike_stands')),
+                _number(dictData.get('bike_stands')),
+                dictData.get('status') == "OPEN",
+                bool(dictData.get('banking')))
+
+    poles = dictData.get('pole')
+    if poles is not None and not isinstance(poles, list):
+        raise ValueError('Station pole must be a list: {0!r}'.format(poles))
+    return (_key(dictData.get('uid')), _key(dictData.get('commune')),
+            tuple(_key(pole) for pole in poles) if poles is not None else None,
+            _number(dictData.get('availableBikes')),
+            _number(dictData.get('availableStands')),
+            _number(dictData.get('totalStands')),
+            bool(dictData.get('status')),
+            bool(dictData.get('banking')))
+
+
+## MAP / REDUCE ##
+def _chunkReduce(path, names, initialFunction, mapFunction) -> tuple:
+    """Worker function: fold a chunk of snapshots into one partial aggregate.
+
+    Args
+    ----
+        path (string): Directory or archive path
+        names (list): Chunk of snapshots names
+        initialFunction, mapFunction: See `replaySnapshots()`
+
+    Returns
+    -------
+        (tuple): (partial aggregate, number of snapshots which cannot be read)
+    """
+    partial = initialFunction()
+    errors = 0
+
+    for datas in _readSnapshots(path, names):
+        if isinstance(datas, dict):
+            datas = datas.get('values')
+        if not isinstance(datas, list):
+            errors += 1
+            continue
+
+        partial = mapFunction(partial, datas)
+
+    return partial, errors
+
+
+def replaySnapshots(path, initialFunction, mapFunction, mergeFunction, workers=None, chunkSize=None) -> tuple:
+    """Public function replays snapshots with a map-reduce over a `ProcessPoolExecutor`.
+    Snapshots are split in chunks. Each worker folds its chunks with `mapFunction`, partial aggregates
+    are sent back to parent process and merged with `mergeFunction`.
+
+    Functions are sent to workers, they must be defined at module level (picklable).
+    Partial aggregates should be made of built-in types in order to stay compact.
+
+    Args
+    ----
+        path (string): Directory or archive (zip, tar) of snapshots.
+        initialFunction (function): `initialFunction()` returns an empty partial aggregate.
+        mapFunction (function): `mapFunction(partial, datas)` adds a snapshot (list of stations
+            dictionnaries, raw API or exported by `VelovStation`) to `partial` and returns it.
+        mergeFunction (function): `mergeFunction(partial, other)` merges `other` into `partial` and returns it.
+        workers (int): Optional. Number of processes. Default is number of CPUs.
+            If 1, snapshots are aggregated in current process.
+        chunkSize (int): Optional. Number of snapshots sent to a worker at once.
+            Default split snapshots in 4 chunks per worker (1 chunk per worker for a tar archive).
+
+    Raises
+    ------
+        VelovReplayError: If `path` is neither a directory nor an archive.
+
+    Returns
+    -------
+        (tuple): (aggregate of all snapshots, number of snapshots which cannot be read)
+
+    Examples
+    --------
+        def emptyCount():
+            return 0
+
+        def countStations(partial, datas):
+            return partial + len(datas)
+
+        def sumCounts(partial, other):
+            return partial + other
+
+        total, errors = replaySnapshots('archives/2021-02.zip', emptyCount, countStations, sumCounts)
+    """
+    names = listSnapshots(path)
+    workers = workers or os.cpu_count() or 1
+
+    if chunkSize is None:
+        # A tar archive is read from its start by each chunk (a compressed tar is decompressed again),
+        # so it is split in one contiguous chunk per worker
+        isTar = os.path.isfile(path) and not zipfile.is_zipfile(path)
+        chunksPerWorker = 1 if isTar else 4
+        chunkSize = -(-len(names) // (workers * chunksPerWorker))
+    chunkSize = max(1, chunkSize)
+
+    chunks = [names[index:index + chunkSize] for index in range(0, len(names), chunkSize)]
+    result = initialFunction()
+    errors = 0
+
+    if workers == 1 or len(chunks) <= 1:
+        partials = (_chunkReduce(path, chunk, initialFunction, mapFunction)
+                    for chunk in chunks)
+        for partial, chunkErrors in partials:
+            result = mergeFunction(result, partial)
+            errors += chunkErrors
+        return result, errors
+
+    count = len(chunks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = executor.map(_chunkReduce, [path] * count, chunks,
+                                [initialFunction] * count, [mapFunction] * count)
+        for partial, chunkErrors in partials:
+            result = mergeFunction(result, partial)
+            errors += chunkErrors
+
+    return result, errors
+
+
+def emptyPartial() -> dict:
+    """Create an empty partial aggregate of `VelovReplay` statistics.
+
+    Returns
+    -------
+        (dict): Partial aggregate. Only built-in types, in order to stay compact when sent between processes.
+
+        Keys:
+        - snapshots (int): Snapshots read
+        - records (int): Stations records read
+        - badRecords (int): Stations records which are not valid station dictionnaries
+        - totalAvailableBikes (int)
+        - totalAvailableStands (int)
+        - totalStands (int)
+        - statusStations (list): [OPEN, CLOSED]
+        - bankingStations (list): [WITH BANKING, WITHOUT BANKING]
+        - polesSet (set)
+        - communes (dict): commune => [records, open, bikes, stands, totalStands, {availableBikes: occurrences}]
+        - stations (dict): uid => [records, open, bikes, stands, {availableBikes: occurrences}]
+    """
+    return {
+        'snapshots': 0,
+        'records': 0,
+        'badRecords': 0,
+        'totalAvailableBikes': 0,
+        'totalAvailableStands': 0,
+        'totalStands': 0,
+        'statusStations': [0, 0],
+        'bankingStations': [0, 0],
+        'polesSet': set(),
+        'communes': {},
+        'stations': {}
+    }
+
+
+def mapSnapshot(partial, datas) -> dict:
+    """Add a snapshot to a partial aggregate of `VelovReplay` statistics.
+    Stations which are not valid dictionnaries are counted in `badRecords`.
+
+    Args
+    ----
+        partial (dict): Partial aggregate (see `emptyPartial()`)
+        datas (list): Stations dictionnaries of snapshot
+
+    Returns
+    -------
+        (dict): `partial` updated
+    """
+    communes = partial['communes']
+    stations = partial['stations']
+    polesSet = partial['polesSet']
+
+    partial['snapshots'] += 1
+    for dictData in datas:
+        try:
+            uid, commune, poles, bikes, stands, total, status, banking = _stationRecord(
+                dictData)
+        except ValueError:
+            partial['badRecords'] += 1
+            continue
+
+        opened = 1 if status else 0
+
+        partial['records'] += 1
+        partial['totalAvailableBikes'] += bikes
+        partial['totalAvailableStands'] += stands
+        partial['totalStands'] += total
+        partial['statusStations'][1 - opened] += 1
+        partial['bankingStations'][0 if banking else 1] += 1
+
+        if poles is None:
+            polesSet.add(None)
+        else:
+            polesSet.update(poles)
+
+        group = communes.get(commune)
+        if group is None:
+            group = communes[commune] = [0, 0, 0, 0, 0, {}]
+        group[0] += 1
+        group[1] += opened
+        group[2] += bikes
+        group[3] += stands
+        group[4] += total
+        group[5][bikes] = group[5].get(bikes, 0) + 1
+
+        group = stations.get(uid)
+        if group is None:
+            group = stations[uid] = [0, 0, 0, 0, {}]
+        group[0] += 1
+        group[1] += opened
+        group[2] += bikes
+        group[3] += stands
+        group[4][bikes] = group[4].get(bikes, 0) + 1
+
+    return partial
+
+
+def _mergeGroups(groups, others) -> None:
+    """Merge groups `others` into `groups`. Last value of a group is a histogram, others are sums."""
+    for key, values in others.items():
+        group = groups.get(key)
+        if group is None:
+            groups[key] = values
+            continue
+
+        for index in range(len(values) - 1):
+            group[index] += values[index]
+        histogram = group[-1]
+        for bikes, occurrences in values[-1].items():
+            histogram[bikes] = histogram.get(bikes, 0) + occurrences
+
+
+def mergePartials(partial, other) -> dict:
+    """Merge partial aggregate `other` into `partial`.
+
+    Args
+    ----
+        partial (dict): Partial aggregate updated
+        other (dict): Partial aggregate merged
+
+    Returns
+    -------
+        (dict): `partial` updated
+    """
+    for key in ('snapshots', 'records', 'badRecords', 'totalAvailableBikes', 'totalAvailableStands', 'totalStands'):
+        partial[key] += other[key]
+
+    for key in ('statusStations', 'bankingStations'):
+        partial[key][0] += other[key][0]
+        partial[key][1] += other[key][1]
+
+    partial['polesSet'].update(other['polesSet'])
+    _mergeGroups(partial['communes'], other['communes'])
+    _mergeGroups(partial['stations'], other['stations'])
+
+    return partial
+
+
+def _percentage(part, total):
+    """Return percentage (2 digits after comma) or None if `total` is 0"""
+    if not total:
+        return None
+    return round(part * 100 / total, 2)
+
+
+class VelovReplay:
+    """
+    Class represents a replay of archived snapshots with default statistics
+    (`emptyPartial()`, `mapSnapshot()` and `mergePartials()` given to `replaySnapshots()`).
+    Other aggregates can be computed by calling `replaySnapshots()` with other functions.
+
+    Attributes
+    -----------
+    - `path`(string): Directory or archive of snapshots
+    - `workers`(int): Number of processes
+    - `chunkSize`(int): Number of snapshots per chunk
+
+    Examples
+    --------
+        replay = VelovReplay('archives/2021-02.zip')
+        stats = replay.getProperties()
+    """
+
+    def __init__(self, path, workers=None, chunkSize=None) -> None:
+        """Constructor.
+        Replay snapshots and compute aggregates.
+
+        Args
+        ----
+            path (string): Directory or archive (zip, tar) of snapshots.
+            workers (int): Optional. See `replaySnapshots()`
+            chunkSize (int): Optional. See `replaySnapshots()`
+
+        Raises
+        ------
+            VelovReplayError: If `path` is neither a directory nor an archive.
+        """
+        self.path = path
+        self.workers = workers
+        self.chunkSize = chunkSize
+
+        self.__partial, self.__errors = replaySnapshots(
+            path, emptyPartial, mapSnapshot, mergePartials, workers, chunkSize)
+
+        return None
+
+    ## GETTERS ##
+    def getProperties(self) -> dict:
+        """Return statistics computed over all snapshots.
+        Totals are sums over all snapshots, averages are per snapshot.
+
+        Returns:
+            dict: Dict of statistics
+
+            Keys:
+            - snapshots (int)
+            - errors (int)
+            - records (int)
+            - badRecords (int)
+            - totalAvailableBikes (int)
+            - totalAvailableStands (int)
+            - percentageAvailableStands (float)
+            - totalStands (int)
+            - averageAvailableBikes (float)
+            - averageAvailableStands (float)
+            - statusStations (tuple)
+            - bankingStations (tuple)
+            - polesSet (set)
+            - communesSet (set)
+        """
+        partial = self.__partial
+        snapshots = partial['snapshots']
+
+        return {
+            'snapshots': snapshots,
+            'errors': self.__errors,
+            'records': partial['records'],
+            'badRecords': partial['badRecords'],
+            'totalAvailableBikes': partial['totalAvailableBikes'],
+            'totalAvailableStands': partial['totalAvailableStands'],
+            'percentageAvailableStands': _percentage(partial['totalAvailableStands'], partial['totalStands']),
+            'totalStands': partial['totalStands'],
+            'averageAvailableBikes': round(partial['totalAvailableBikes'] / snapshots, 2) if snapshots else None,
+            'averageAvailableStands': round(partial['totalAvailableStands'] / snapshots, 2) if snapshots else None,
+            'statusStations': tuple(partial['statusStations']),
+            'bankingStations': tuple(partial['bankingStations']),
+            'polesSet': set(partial['polesSet']),
+            'communesSet': set(partial['communes'])
+        }
+
+    def getCommunesStats(self) -> dict:
+        """Return statistics per commune.
+
+        Returns:
+            dict: commune => dict of statistics
+
+            Keys:
+            - records (int): Stations records of commune
+            - openRecords (int): Records with station OPEN
+            - availableBikes (int): Sum over all snapshots
+            - availableStands (int): Sum over all snapshots
+            - totalStands (int): Sum over all snapshots
+            - percentageAvailableStands (float)
+            - histogram (dict): availableBikes => occurrences (station records)
+        """
+        communes = {}
+        for commune, values in self.__partial['communes'].items():
+            communes[commune] = {
+                'records': values[0],
+                'openRecords': values[1],
+                'availableBikes': values[2],
+                'availableStands': values[3],
+                'totalStands': values[4],
+                'percentageAvailableStands': _percentage(values[3], values[4]),
+                'histogram': dict(sorted(values[5].items()))
+            }
+        return communes
+
+    def getStationsStats(self) -> dict:
+        """Return statistics per station.
+
+        Returns:
+            dict: uid => dict of statistics
+
+            Keys:
+            - records (int): Snapshots in which station appears
+            - openRecords (int): Records with station OPEN
+            - averageAvailableBikes (float)
+            - averageAvailableStands (float)
+            - histogram (dict): availableBikes => occurrences
+        """
+        stations = {}
+        for uid, values in self.__partial['stations'].items():
+            stations[uid] = {
+                'records': values[0],
+                'openRecords': values[1],
+                'averageAvailableBikes': round(values[2] / values[0], 2),
+                'averageAvailableStands': round(values[3] / values[0], 2),
+                'histogram': dict(sorted(values[4].items()))
+            }
+        return stations
+
+
+pass
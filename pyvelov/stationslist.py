@@ -8,7 +8,7 @@ Author website: https://www.matthieubouchet.fr
 GitHub project: https://github.com/MatthieuBOUCHET/PyVelov
 """
 
-from pyvelov import api, station
+from pyvelov import api, station, aggregation
 
 from datetime import datetime
 import os
@@ -23,13 +23,19 @@ class VelovStationsList(list):
 
     OVERLOADED METHODS
     -------------------
-    - `append()`
+    - `append()`, `extend()`, `insert()`, `remove()`, `pop()`, `clear()`
+    - `__setitem__()`, `__delitem__()`, `__iadd__()`, `__imul__()`
+
+    Overloaded methods verify stations type and keep aggregation (`getAggregation()`) up to date.
 
     Parent
     -------
         - list (built-in): [description]
     """
 
+    # zooms (tuple) => VelovAggregation, created by `getAggregation()`
+    __aggregations = None
+
     def __init__(self, total, *args) -> None:
         """Constructor with a variable number of arguments.
         Each *args argument must be a `VelovStation` class instanciation.
@@ -75,6 +81,31 @@ class VelovStationsList(list):
 
     ## OVERLOAD ##
 
+    def __typeVerification(self, station) -> None:
+        """Verify argument is a `VelovStation` class instanciation.
+
+        Raises
+        ------
+            ValueError if `station`argument is not a `VelovStation` class instanciation.
+        """
+        typeArg = str(type(station))
+        if not('VelovStation' in typeArg):
+            raise ValueError('Argument must be a VelovStation object')
+
+    def __aggregationAdd(self, stations) -> None:
+        """Add stations to every aggregation computed"""
+        if self.__aggregations is not None:
+            for aggregated in self.__aggregations.values():
+                for station in stations:
+                    aggregated.addStation(station)
+
+    def __aggregationRemove(self, stations) -> None:
+        """Remove stations from every aggregation computed"""
+        if self.__aggregations is not None:
+            for aggregated in self.__aggregations.values():
+                for station in stations:
+                    aggregated.removeStation(station)
+
     def append(self, station) -> None:
         """Overloading of append function.
         Call parent list class append method.
@@ -93,11 +124,115 @@ class VelovStationsList(list):
         """
 
         # TYPE VERIFICATION
-        typeArg = str(type(station))
-        if not('VelovStation' in typeArg):
-            raise ValueError('Argument must be a VelovStation object')
+        self.__typeVerification(station)
+
+        super().append(station)
+        self.__aggregationAdd((station,))
+        return None
 
-        return super().append(station)
+    def extend(self, stations) -> None:
+        """Overloading of extend function. Append each station of `stations`.
+
+        Raises
+        ------
+            ValueError if one station is not a `VelovStation` class instanciation.
+        """
+        for station in list(stations):
+            self.append(station)
+
+    def insert(self, index, station) -> None:
+        """Overloading of insert function.
+
+        Raises
+        ------
+            ValueError if `station`argument is not a `VelovStation` class instanciation.
+        """
+        self.__typeVerification(station)
+
+        super().insert(index, station)
+        self.__aggregationAdd((station,))
+
+    def remove(self, station) -> None:
+        """Overloading of remove function."""
+        index = self.index(station)
+        del self[index]
+
+    def pop(self, index=-1):
+        """Overloading of pop function."""
+        station = super().pop(index)
+        self.__aggregationRemove((station,))
+        return station
+
+    def clear(self) -> None:
+        """Overloading of clear function."""
+        self.__aggregationRemove(self)
+        super().clear()
+
+    def __setitem__(self, key, value) -> None:
+        """Overloading of `list[key] = value` (index or slice).
+
+        Raises
+        ------
+            ValueError if a value is not a `VelovStation` class instanciation.
+        """
+        if isinstance(key, slice):
+            value = list(value)
+            for station in value:
+                self.__typeVerification(station)
+            old = self[key]
+        else:
+            self.__typeVerification(value)
+            old = [self[key]]
+
+        super().__setitem__(key, value)
+        self.__aggregationRemove(old)
+        self.__aggregationAdd(value if isinstance(key, slice) else (value,))
+
+    def __delitem__(self, key) -> None:
+        """Overloading of `del list[key]` (index or slice)."""
+        old = self[key] if isinstance(key, slice) else [self[key]]
+
+        super().__delitem__(key)
+        self.__aggregationRemove(old)
+
+    def __iadd__(self, stations):
+        """Overloading of `list += stations`."""
+        self.extend(stations)
+        return self
+
+    def __imul__(self, number):
+        """Overloading of `list *= number`."""
+        old = list(self)
+        super().__imul__(number)
+
+        if len(self) >= len(old):
+            self.__aggregationAdd(self[len(old):])
+        else:
+            self.__aggregationRemove(old)
+        return self
+
+    def updateStation(self, station) -> None:
+        """Replace station with the same uid by `station` (or append it if uid is unknown).
+        Aggregation (if computed) is updated.
+
+        Args
+        -----
+            station (VelovStation): A `VelovStation` class instanciation.
+
+        Raises
+        ------
+            ValueError if `station`argument is not a `VelovStation` class instanciation.
+        """
+        self.__typeVerification(station)
+
+        uid = station.getAttribute('uid')
+        for index in range(len(self)):
+            if self[index].getAttribute('uid') == uid:
+                self[index] = station
+                return None
+
+        self.append(station)
+        return None
 
     ## STATS ##
     def __sumAttribute(self, attribute) -> int:
@@ -227,6 +362,27 @@ class VelovStationsList(list):
             'communesSet': self.communesSet
         }
 
+    def getAggregation(self, zooms=aggregation.DEFAULT_ZOOMS) -> aggregation.VelovAggregation:
+        """Return groups of stations per commune, per pole and per map tile.
+        Aggregation is computed once and cached, list changes afterwards (`append()`, `updateStation()`,
+        `remove()`, `list[index] = station`...) update it.
+
+        Args
+        ----
+            zooms (tuple): Optional. Zoom levels of tiles. One aggregation is cached per zoom levels.
+
+        Returns:
+            VelovAggregation: Aggregation of stations
+        """
+        zooms = tuple(zooms)
+        if self.__aggregations is None:
+            self.__aggregations = {}
+
+        if zooms not in self.__aggregations:
+            self.__aggregations[zooms] = aggregation.VelovAggregation(self, zooms)
+
+        return self.__aggregations[zooms]
+
     ## EXPORTATION ##
     def exportListJSON(self) -> str:
         """Method export a JSON string
@@ -0,0 +1,157 @@
+"""
+Tests of `pyvelov.aggregation` and of the aggregation cached by `VelovStationsList`.
+`api.createAPIInstance()` is replaced while `stationslist` is imported, no API connection is made.
+"""
+
+import importlib
+import sys
+import unittest
+from unittest import mock
+
+from pyvelov import aggregation, api, station
+
+# Place Bellecour, Lyon
+BELLECOUR = (45.7578, 4.8320)
+
+
+def velovStation(number, bikes=3, stands=7, commune=None, pole='Bellecour', status='OPEN',
+                 position=BELLECOUR):
+    return station.VelovStation({
+        'number': number, 'gid': number, 'name': 'Station {0}'.format(number), 'address': '',
+        'address2': None, 'commune': commune or 'Commune {0}'.format(number), 'pole': pole,
+        'lat': position[0], 'lng': position[1], 'bike_stands': bikes + stands,
+        'available_bike_stands': stands, 'available_bikes': bikes, 'status': status,
+        'availabilitycode': 1, 'banking': False, 'last_update': None, 'code_insee': None})
+
+
+class TileCoordinatesTestCase(unittest.TestCase):
+
+    def test_lyon(self):
+        self.assertEqual(aggregation.tileCoordinates(*BELLECOUR, 12), (2102, 1461))
+        self.assertEqual(aggregation.tileCoordinates(*BELLECOUR, 14), (8411, 5844))
+        self.assertEqual(aggregation.tileCoordinates(*BELLECOUR, 16), (33647, 23378))
+
+    def test_unknown_position(self):
+        self.assertIsNone(aggregation.tileCoordinates(None, 4.832, 14))
+
+
+class VelovAggregationTestCase(unittest.TestCase):
+
+    def test_groups(self):
+        stations = [velovStation(1, commune='Lyon 2 ème', pole='Bellecour, Perrache'),
+                    velovStation(2, bikes=5, stands=5, commune='Lyon 2 ème', status='CLOSED'),
+                    velovStation(3, commune='Villeurbanne', pole=None, position=(None, None))]
+        aggregated = aggregation.VelovAggregation(stations)
+
+        self.assertEqual(len(aggregated), 3)
+        self.assertEqual(aggregated.getCommune('Lyon 2 ème'), {
+            'stations': 2, 'openStations': 1, 'availableBikes': 8, 'availableStands': 12,
+            'totalStands': 20, 'percentageAvailableStands': 60.0, 'fillPercentage': 40.0})
+        self.assertEqual(aggregated.getPole('Bellecour')['stations'], 2)
+        self.assertEqual(aggregated.getPole('Perrache')['stations'], 1)
+        self.assertEqual(aggregated.getPole(None)['stations'], 1)
+        self.assertEqual(aggregated.getTile(14, 8411, 5844)['stations'], 2)
+        self.assertEqual(list(aggregated.getTiles(16)), [(33647, 23378)])
+        self.assertIsNone(aggregated.getTile(13, 4205, 2922))
+        self.assertIsNone(aggregated.getCommune('Bron'))
+
+    def test_add_remove_round_trip(self):
+        aggregated = aggregation.VelovAggregation()
+        stations = [velovStation(number) for number in range(5)]
+        duplicate = velovStation(0, bikes=10, stands=0)
+
+        for added in stations + [duplicate, stations[1]]:
+            aggregated.addStation(added)
+        self.assertEqual(len(aggregated), 7)
+        self.assertEqual(aggregated.getTile(14, 8411, 5844)['stations'], 7)
+        self.assertEqual(aggregated.getCommune('Commune 0')['availableBikes'], 13)
+        self.assertEqual(aggregated.getCommune('Commune 1')['stations'], 2)
+
+        for removed in stations + [duplicate, stations[1]]:
+            self.assertTrue(aggregated.removeStation(removed))
+        self.assertFalse(aggregated.removeStation(stations[0]))
+
+        self.assertEqual(len(aggregated), 0)
+        self.assertEqual(aggregated.getCommunes(), {})
+        self.assertEqual(aggregated.getPoles(), {})
+        for zoom in aggregated.zooms:
+            self.assertEqual(aggregated.getTiles(zoom), {})
+
+
+class VelovStationsListAggregationTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        sys.modules.pop('pyvelov.stationslist', None)
+        with mock.patch.object(api, 'createAPIInstance', return_value=()):
+            cls.stationslist = importlib.import_module('pyvelov.stationslist')
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.modules.pop('pyvelov.stationslist', None)
+
+    def assertSynchronized(self, stationsList, zooms=aggregation.DEFAULT_ZOOMS):
+        cached = stationsList.getAggregation(zooms)
+        computed = aggregation.VelovAggregation(stationsList, cached.zooms)
+
+        self.assertEqual(len(cached), len(stationsList))
+        self.assertEqual(cached.getCommunes(), computed.getCommunes())
+        self.assertEqual(cached.getPoles(), computed.getPoles())
+        for zoom in cached.zooms:
+            self.assertEqual(cached.getTiles(zoom), computed.getTiles(zoom))
+
+    def test_list_changes(self):
+        stationsList = self.stationslist.VelovStationsList(
+            False, *[velovStation(number) for number in range(4)])
+        default = stationsList.getAggregation()
+        coarse = stationsList.getAggregation((10,))
+
+        changes = [
+            lambda: stationsList.pop(),
+            lambda: stationsList.remove(stationsList[0]),
+            lambda: stationsList.extend([velovStation(10)]),
+            lambda: stationsList.__setitem__(0, velovStation(11)),
+            lambda: stationsList.insert(0, velovStation(12)),
+            lambda: stationsList.__delitem__(slice(1, 3)),
+            lambda: stationsList.__setitem__(slice(0, 1), [velovStation(13), velovStation(14)]),
+            lambda: stationsList.__iadd__([velovStation(15)]),
+            lambda: stationsList.append(velovStation(13, bikes=9)),
+            lambda: stationsList.__imul__(2),
+            lambda: stationsList.pop(0),
+            lambda: stationsList.__imul__(0),
+            lambda: stationsList.append(velovStation(16)),
+            lambda: stationsList.clear(),
+        ]
+        for change in [lambda: None] + changes:
+            change()
+            self.assertSynchronized(stationsList)
+            self.assertSynchronized(stationsList, (10,))
+            self.assertIs(stationsList.getAggregation(), default)
+            self.assertIs(stationsList.getAggregation([10]), coarse)
+
+    def test_update_station(self):
+        stationsList = self.stationslist.VelovStationsList(
+            False, velovStation(1), velovStation(2, commune='Commune 1'))
+        stationsList.getAggregation()
+
+        stationsList.updateStation(velovStation(1, bikes=10, stands=0, commune='Bron'))
+        stationsList.updateStation(velovStation(3))
+
+        self.assertEqual(len(stationsList), 3)
+        self.assertSynchronized(stationsList)
+        self.assertEqual(stationsList.getAggregation().getCommune('Commune 1')['stations'], 1)
+        self.assertEqual(stationsList.getAggregation().getCommune('Bron')['availableBikes'], 10)
+
+    def test_type_verification(self):
+        stationsList = self.stationslist.VelovStationsList(False, velovStation(1))
+        stationsList.getAggregation()
+
+        with self.assertRaises(ValueError):
+            stationsList[0:0] = [velovStation(2), 'station']
+        with self.assertRaises(ValueError):
+            stationsList.insert(0, None)
+        self.assertSynchronized(stationsList)
+
+
+if __name__ == '__main__':
+    unittest.main()
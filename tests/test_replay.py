@@ -0,0 +1,164 @@
+"""
+Tests of `pyvelov.replay`. Snapshots are written in a temporary directory, no API connection is made.
+"""
+
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from pyvelov import replay
+
+
+def rawStation(number, bikes, stands, commune='Lyon 1 er', pole='Hôtel de Ville', status='OPEN'):
+    return {'number': number, 'commune': commune, 'pole': pole, 'available_bikes': bikes,
+            'available_bike_stands': stands, 'bike_stands': bikes + stands, 'status': status,
+            'banking': False}
+
+
+EXPORTED_STATION = {'uid': 2, 'commune': 'Villeurbanne', 'pole': ['Gratte-Ciel'], 'availableBikes': 3,
+                    'availableStands': 1, 'totalStands': 4, 'status': False, 'banking': True}
+
+
+class ReplayTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tempDir.name, 'snapshots')
+        os.mkdir(self.directory)
+
+        for index in range(12):
+            if index % 2:
+                datas = {'values': [rawStation(1, index, 10 - index)]}
+            else:
+                datas = [EXPORTED_STATION, rawStation(1, index, 10 - index)]
+            self.__write('snapshot_{0:02d}.json'.format(index), json.dumps(datas))
+
+        # Unreadable snapshot, snapshot which is not a list and snapshot with bad records
+        self.__write('broken.json', '{')
+        self.__write('notlist.json', '42')
+        self.__write('badrecords.json', json.dumps(
+            {'values': [None, 1, {'number': 3, 'commune': ['x']}, {'number': 4, 'available_bikes': '3'},
+                        rawStation(5, 2, 2, commune='Bron', pole=None)]}))
+
+        self.zipPath = os.path.join(self.tempDir.name, 'snapshots.zip')
+        with zipfile.ZipFile(self.zipPath, 'w') as archive:
+            for fileName in os.listdir(self.directory):
+                archive.write(os.path.join(self.directory, fileName), fileName)
+
+        self.tarPath = os.path.join(self.tempDir.name, 'snapshots.tar.gz')
+        with tarfile.open(self.tarPath, 'w:gz') as archive:
+            for fileName in reversed(sorted(os.listdir(self.directory))):
+                archive.add(os.path.join(self.directory, fileName), fileName)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def __write(self, fileName, content):
+        with open(os.path.join(self.directory, fileName), 'w') as fileWrite:
+            fileWrite.write(content)
+
+    def __results(self, replayed):
+        return (replayed.getProperties(), replayed.getCommunesStats(), replayed.getStationsStats())
+
+    def test_parallel_equals_serial(self):
+        serial = self.__results(replay.VelovReplay(self.directory, workers=1))
+
+        for path in (self.directory, self.zipPath, self.tarPath):
+            for chunkSize in (None, 1, 4):
+                parallel = replay.VelovReplay(path, workers=3, chunkSize=chunkSize)
+                self.assertEqual(self.__results(parallel), serial)
+
+    def test_totals(self):
+        properties = replay.VelovReplay(self.directory, workers=1).getProperties()
+
+        self.assertEqual(properties['snapshots'], 13)
+        self.assertEqual(properties['errors'], 2)
+        self.assertEqual(properties['records'], 19)
+        self.assertEqual(properties['badRecords'], 4)
+        self.assertEqual(properties['totalAvailableBikes'], sum(range(12)) + 6 * 3 + 2)
+        self.assertEqual(properties['totalStands'], 12 * 10 + 6 * 4 + 4)
+        self.assertEqual(properties['statusStations'], (13, 6))
+        self.assertEqual(properties['bankingStations'], (6, 13))
+        self.assertEqual(properties['polesSet'], {'Hôtel de Ville', 'Gratte-Ciel', None})
+        self.assertEqual(properties['communesSet'], {'Lyon 1 er', 'Villeurbanne', 'Bron'})
+
+    def test_histograms(self):
+        replayed = replay.VelovReplay(self.directory, workers=1)
+
+        station = replayed.getStationsStats()[1]
+        self.assertEqual(station['records'], 12)
+        self.assertEqual(station['histogram'], {bikes: 1 for bikes in range(12)})
+        self.assertEqual(station['averageAvailableBikes'], 5.5)
+
+        commune = replayed.getCommunesStats()['Villeurbanne']
+        self.assertEqual(commune['records'], 6)
+        self.assertEqual(commune['openRecords'], 0)
+        self.assertEqual(commune['histogram'], {3: 6})
+        self.assertEqual(commune['percentageAvailableStands'], 25.0)
+
+    def test_merge_partials(self):
+        first = replay.mapSnapshot(replay.emptyPartial(), [rawStation(1, 2, 3), EXPORTED_STATION])
+        second = replay.mapSnapshot(replay.emptyPartial(), [rawStation(1, 4, 1), None])
+        merged = replay.mergePartials(first, second)
+
+        self.assertEqual(merged['snapshots'], 2)
+        self.assertEqual(merged['records'], 3)
+        self.assertEqual(merged['badRecords'], 1)
+        self.assertEqual(merged['totalAvailableBikes'], 9)
+        self.assertEqual(merged['stations'][1], [2, 2, 6, 4, {2: 1, 4: 1}])
+        self.assertEqual(merged['communes']['Lyon 1 er'], [2, 2, 6, 4, 10, {2: 1, 4: 1}])
+
+    def test_custom_map_reduce(self):
+        total, errors = replay.replaySnapshots(
+            self.zipPath, int, _countStations, _sumCounts, workers=2, chunkSize=2)
+
+        self.assertEqual(total, 12 + 6 + 5)
+        self.assertEqual(errors, 2)
+
+    def test_corrupted_zip_member(self):
+        content = json.dumps([rawStation(number, 2, 2) for number in range(50)])
+
+        for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            path = os.path.join(self.tempDir.name, 'corrupted_{0}.zip'.format(compression))
+            with zipfile.ZipFile(path, 'w', compression) as archive:
+                archive.writestr('a.json', content)
+                archive.writestr('b.json', content)
+
+            with open(path, 'rb') as fileRead:
+                datas = bytearray(fileRead.read())
+            # Corrupt data of first member (local header is 30 bytes + name)
+            for index in range(40, 60):
+                datas[index] ^= 0xFF
+            with open(path, 'wb') as fileWrite:
+                fileWrite.write(datas)
+
+            total, errors = replay.replaySnapshots(path, int, _countStations, _sumCounts, workers=1)
+            self.assertEqual((total, errors), (50, 1))
+
+    def test_truncated_tar(self):
+        with open(self.tarPath, 'rb') as fileRead:
+            datas = fileRead.read()
+        with open(self.tarPath, 'wb') as fileWrite:
+            fileWrite.write(datas[:-200])
+
+        with self.assertRaises(replay.VelovReplayError):
+            replay.VelovReplay(self.tarPath, workers=1)
+
+    def test_bad_path(self):
+        with self.assertRaises(replay.VelovReplayError):
+            replay.VelovReplay(os.path.join(self.directory, 'broken.json'))
+
+
+def _countStations(partial, datas):
+    return partial + len(datas)
+
+
+def _sumCounts(partial, other):
+    return partial + other
+
+
+if __name__ == '__main__':
+    unittest.main()